@@ -1,16 +1,150 @@
-import base64
-import json
+from __future__ import annotations
+
+import atexit
 import os
-import smtplib
-import traceback
-import socket
-import getpass
-import inspect
-import urllib.request
+import logging
+from collections import deque
 from datetime import datetime
+from functools import lru_cache, partial
+from json.encoder import encode_basestring_ascii
 from pathlib import Path
-from typing import Callable, Optional
+from typing import TYPE_CHECKING, Callable, Mapping, NamedTuple, Optional
+import queue
+import string
+import threading
 import time
+import traceback
+
+# Network, mail and introspection modules are only needed once a notification
+# is sent, so they are imported by the helpers that use them. ``string`` and
+# ``traceback`` are imported above because ``logging`` loads them anyway.
+if TYPE_CHECKING:
+    import http.client
+    import smtplib
+    import urllib.parse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+log = logging.getLogger(__name__)
+
+
+# Seconds a pooled SMTP connection is reused before it is replaced. Servers
+# commonly drop idle sessions with ``421 Timeout`` after a couple of minutes.
+_SMTP_MAX_AGE = 100
+
+_smtp_pool: dict[tuple[str, int], tuple[smtplib.SMTP, float]] = {}
+_smtp_lock = threading.Lock()
+
+# Default timeout in seconds for each SMTP or HTTP request.
+_TIMEOUT = 10
+
+# Socket waits one delivery may spend ``timeout`` on: the SMTP NOOP check or
+# the first HTTP attempt, a reconnect, and the send itself.
+_NOTIFY_PHASES = 3
+
+
+def _notify_limit(timeout: float) -> float:
+    """Return the upper bound in seconds on delivering to all channels."""
+
+    return _NOTIFY_PHASES * timeout
+
+
+Channel = Callable[[str, str], None]
+
+# ``fire_and_forget`` deliveries, one item per channel, served by at most
+# ``_NOTIFY_WORKERS`` long-lived threads. Each worker maps to the monotonic time
+# its current delivery gives up, or 0 while it is idle.
+_NOTIFY_WORKERS = 2
+_notify_queue: queue.Queue[tuple[Channel, str, str, float]] = queue.Queue()
+_workers: dict[threading.Thread, float] = {}
+_workers_lock = threading.Lock()
+# Set once the queue is drained at exit; later notifications are sent inline.
+_exiting = threading.Event()
+
+_http_pool: dict[tuple[str, str], list[http.client.HTTPConnection]] = {}
+_http_lock = threading.Lock()
+
+# JSON request bodies with ``%s`` slots for values already encoded with
+# ``_dumps``, so only the variable strings are serialized per request.
+_OUTLOOK_PAYLOAD = (
+    b'{"message": {"subject": %s, '
+    b'"body": {"contentType": "Text", "content": %s}, '
+    b'"from": {"emailAddress": {"address": %s}}, '
+    b'"toRecipients": [{"emailAddress": {"address": %s}}]}, '
+    b'"saveToSentItems": "false"}'
+)
+_TEAMS_PAYLOAD = b'{"text": %s}'
+_JIRA_PAYLOAD = (
+    b'{"fields": {"summary": %s, "description": %s, '
+    b'"project": {"key": %s}, "issuetype": {"name": %s}}}'
+)
+
+
+def _dumps_stdlib(value: str) -> bytes:
+    """Encode ``value`` as a JSON string literal.
+
+    Every payload slot holds a string, so the C string encoder is called
+    directly instead of going through ``json.dumps`` and ``JSONEncoder``.
+    """
+
+    return encode_basestring_ascii(value).encode("ascii")
+
+
+def _dumps_orjson(value: str) -> bytes:
+    """Encode ``value`` with orjson, which rejects lone surrogates.
+
+    Such strings come from names decoded with ``surrogateescape``; the stdlib
+    encoder escapes them instead.
+    """
+
+    try:
+        return orjson.dumps(value)
+    except orjson.JSONEncodeError:
+        return _dumps_stdlib(value)
+
+
+_dumps: Callable[[str], bytes] = (
+    _dumps_orjson if orjson is not None else _dumps_stdlib
+)
+
+
+class _Env(NamedTuple):
+    """Snapshot of the notification settings read from the environment.
+
+    The Jira issue endpoint and ``Authorization`` header are derived from
+    ``JIRA_URL``, ``JIRA_EMAIL`` and ``JIRA_TOKEN`` when the snapshot is taken,
+    and ``jira_enabled`` records whether every Jira setting is present.
+    """
+
+    outlook_token: Optional[str]
+    teams_webhook: Optional[str]
+    jira_endpoint: Optional[str]
+    jira_auth: Optional[str]
+    jira_project: Optional[str]
+    jira_type: str
+    jira_enabled: bool
+
+
+def _read_env() -> _Env:
+    jira_url = os.getenv("JIRA_URL")
+    jira_email = os.getenv("JIRA_EMAIL")
+    jira_token = os.getenv("JIRA_TOKEN")
+    jira_project = os.getenv("JIRA_PROJECT")
+    return _Env(
+        os.getenv("OUTLOOK_TOKEN"),
+        os.getenv("TEAMS_WEBHOOK"),
+        f"{jira_url.rstrip('/')}/rest/api/3/issue" if jira_url else None,
+        _basic_auth(jira_email, jira_token)
+        if jira_email and jira_token
+        else None,
+        jira_project,
+        os.getenv("JIRA_ISSUE_TYPE", "Task"),
+        bool(jira_url and jira_email and jira_token and jira_project),
+    )
 
 
 def email_on_failure(
@@ -19,6 +153,10 @@ def email_on_failure(
     markdown: Optional[os.PathLike[str] | str] = None,
     retries: int = 1,
     delay: float = 60,
+    refresh_env: bool = False,
+    batch_window: Optional[float] = None,
+    fire_and_forget: bool = True,
+    timeout: float = _TIMEOUT,
 ) -> Callable:
     """Decorator to send email notifications on success or failure.
 
@@ -39,190 +177,847 @@ def email_on_failure(
         additional attempt.
     delay: float, optional
         Seconds to wait between retries. Defaults to 60 seconds.
+    refresh_env: bool, optional
+        Re-read the notification environment variables, and choose the
+        notifiers from them, on every call instead of once when the decorator
+        is applied. Defaults to ``False``.
+    batch_window: float, optional
+        Collect notifications and deliver them every ``batch_window`` seconds
+        from a background thread, merging messages that share a subject.
+        Notifications are sent immediately by default.
+    fire_and_forget: bool, optional
+        Queue notifications for two background worker threads so results and
+        exceptions reach the caller without waiting on the network. Delivery
+        errors are logged. Defaults to ``True``; pass ``False`` to send synchronously.
+    timeout: float, optional
+        Seconds to wait on each SMTP, Outlook, Teams or Jira request before
+        giving up on that channel. Defaults to 10 seconds.
 
     """
 
-    template = Path(markdown).read_text() if markdown else None
+    template = (
+        _load_template(os.fspath(markdown), os.stat(markdown).st_mtime_ns)
+        if markdown
+        else None
+    )
+    render = _compile_template(template) if template is not None else None
+    env = _read_env()
+    if batch_window:
+        notify = _Batcher(batch_window, timeout).add
+    elif fire_and_forget:
+        notify = partial(_notify_in_background, timeout=timeout)
+    else:
+        notify = partial(_notify_all, timeout=timeout)
+    schedule = _schedule(retries, delay)
 
     def decorator(func: Callable) -> Callable:
+        import socket
+
+        machine = socket.gethostname()
+        user = _current_user()
+        parent_dir = os.path.basename(os.path.dirname(_source_file(func)))
+        success_subject = f"{parent_dir} has succeeded."
+        failure_subject = f"{parent_dir} has failed."
+        failure_channels = _channels(
+            origin, destination, env, failed=True, timeout=timeout
+        )
+        success_channels = _channels(
+            origin, destination, env, failed=False, timeout=timeout
+        )
+        local = threading.local()
+
+        def template_context() -> _LazyContext:
+            """Return this thread's reusable template context."""
+
+            try:
+                return local.context
+            except AttributeError:
+                local.context = _LazyContext(
+                    {"function": func.__name__, "machine": machine, "user": user}
+                )
+                return local.context
+
         def wrapper(*args, **kwargs):
-            start = datetime.now()
+            start_ns = time.time_ns()
+            cfg = _read_env() if refresh_env else None
 
-            attempts = 0
-            while True:
+            for pause in schedule:
                 try:
                     result = func(*args, **kwargs)
-                    end = datetime.now()
-                    machine = socket.gethostname()
-                    user = getpass.getuser()
-                    file_path = Path(inspect.getfile(func)).resolve()
-                    parent_dir = file_path.parent.name
-                    subject = f"{parent_dir} has succeeded."
-                    context = {
-                        "function": func.__name__,
-                        "start": start.isoformat(),
-                        "fail_time": end.isoformat(),
-                        "machine": machine,
-                        "user": user,
-                        "error": "",
-                        "traceback": "",
-                    }
-                    if template is not None:
-                        body = template.format(**context)
+                    break
+                except Exception:
+                    time.sleep(pause)
+            else:
+                try:
+                    result = func(*args, **kwargs)
+                except Exception as exc:  # pragma: no cover - network call
+                    fail_time = datetime.now()
+                    subject = failure_subject
+                    if render is not None:
+                        context = template_context()
+                        context.bind(
+                            start=lambda: _isoformat_ns(start_ns),
+                            fail_time=fail_time.isoformat,
+                            error=lambda: exc,
+                            traceback=lambda: _format_traceback(exc),
+                        )
+                        try:
+                            body = render(context)
+                        finally:
+                            context.release()
                     else:
+                        start = datetime.fromtimestamp(start_ns / 1e9)
+                        tb = _format_traceback(exc)
                         body = (
                             f"Function {func.__name__} initiated at {start.isoformat()}\n"
-                            f"Completed at {end.isoformat()}\n"
+                            f"Failed at {fail_time.isoformat()}\n"
                             f"Machine: {machine}\n"
-                            f"User: {user}"
+                            f"User: {user}\n"
+                            f"Error: {exc}\n\n"
+                            f"Traceback:\n{tb}"
                         )
-                    _send_mail(origin, destination, subject, body)
-                    webhook = os.getenv("TEAMS_WEBHOOK")
-                    if webhook:
-                        _send_to_teams(webhook, subject, body)
-                    return result
-
-                except Exception as exc:  # pragma: no cover - network call
-                    if attempts >= retries:
-                        fail_time = datetime.now()
-                        machine = socket.gethostname()
-                        user = getpass.getuser()
-                        tb = traceback.format_exc()
-                        file_path = Path(inspect.getfile(func)).resolve()
-                        parent_dir = file_path.parent.name
-                        subject = f"{parent_dir} has failed."
-                        context = {
-                            "function": func.__name__,
-                            "start": start.isoformat(),
-                            "fail_time": fail_time.isoformat(),
-                            "machine": machine,
-                            "user": user,
-                            "error": exc,
-                            "traceback": tb,
-                        }
-                        if template is not None:
-                            body = template.format(**context)
-                        else:
-                            body = (
-                                f"Function {func.__name__} initiated at {start.isoformat()}\n"
-                                f"Failed at {fail_time.isoformat()}\n"
-                                f"Machine: {machine}\n"
-                                f"User: {user}\n"
-                                f"Error: {exc}\n\n"
-                                f"Traceback:\n{tb}"
-                            )
-                        _send_mail(origin, destination, subject, body)
-                        webhook = os.getenv("TEAMS_WEBHOOK")
-                        if webhook:
-                            _send_to_teams(webhook, subject, body)
-                        jira_url = os.getenv("JIRA_URL")
-                        jira_email = os.getenv("JIRA_EMAIL")
-                        jira_token = os.getenv("JIRA_TOKEN")
-                        jira_project = os.getenv("JIRA_PROJECT")
-                        jira_type = os.getenv("JIRA_ISSUE_TYPE", "Task")
-                        if all([jira_url, jira_email, jira_token, jira_project]):
-                            _create_jira_ticket(
-                                jira_url,
-                                jira_email,
-                                jira_token,
-                                jira_project,
-                                jira_type,
-                                subject,
-                                body,
-                            )
-                        raise
-                    attempts += 1
-                    time.sleep(delay)
+                    notify(
+                        subject,
+                        body,
+                        failure_channels
+                        if cfg is None
+                        else _channels(
+                            origin, destination, cfg, failed=True, timeout=timeout
+                        ),
+                    )
+                    raise
 
+            end = datetime.now()
+            subject = success_subject
+            if render is not None:
+                context = template_context()
+                context.bind(
+                    start=lambda: _isoformat_ns(start_ns),
+                    fail_time=end.isoformat,
+                    error=lambda: "",
+                    traceback=lambda: "",
+                )
+                try:
+                    body = render(context)
+                finally:
+                    context.release()
+            else:
+                start = datetime.fromtimestamp(start_ns / 1e9)
+                body = (
+                    f"Function {func.__name__} initiated at {start.isoformat()}\n"
+                    f"Completed at {end.isoformat()}\n"
+                    f"Machine: {machine}\n"
+                    f"User: {user}"
+                )
+            notify(
+                subject,
+                body,
+                success_channels
+                if cfg is None
+                else _channels(
+                    origin, destination, cfg, failed=False, timeout=timeout
+                ),
+            )
+            return result
 
         return wrapper
 
     return decorator
 
 
-def _send_mail(origin: str, destination: str, subject: str, body: str) -> None:
+def _current_user() -> str:
+    """Return the login name, or ``"unknown"`` when it cannot be determined.
+
+    Containers often run under a UID with no passwd entry, where
+    ``getpass.getuser()`` raises instead of returning a name.
+    """
+
+    import getpass
+
+    try:
+        return getpass.getuser()
+    except (ImportError, KeyError, OSError):
+        return "unknown"
+
+
+def _source_file(func: Callable) -> str:
+    """Return the absolute path of the file defining ``func``."""
+
+    code = getattr(func, "__code__", None)
+    if code is not None:
+        return os.path.abspath(code.co_filename)
+
+    import inspect
+
+    return os.path.abspath(inspect.getfile(func))
+
+
+@lru_cache(maxsize=32)
+def _load_template(path: str, mtime_ns: int) -> str:
+    """Return the text of the template at ``path``.
+
+    ``mtime_ns`` is part of the cache key so edited templates are re-read.
+    """
+
+    return Path(path).read_text()
+
+
+def _schedule(retries: int, delay: float) -> list[float]:
+    """Return the pauses, in seconds, taken before each retry."""
+
+    return [delay] * retries
+
+
+class _LazyContext(dict):
+    """Template context whose per-call fields are computed on first use.
+
+    Fields registered with :meth:`bind` are produced by their thunk the first
+    time a template looks them up, so fields a template never references, such
+    as an expensive ``{traceback}``, cost nothing. :meth:`release` drops them
+    so the context can be reused for the next call.
+    """
+
+    def __init__(self, fields: Mapping[str, object]) -> None:
+        super().__init__(fields)
+        self._thunks: dict[str, Callable[[], object]] = {}
+
+    def __missing__(self, key: str) -> object:
+        value = self[key] = self._thunks[key]()
+        return value
+
+    def bind(self, **thunks: Callable[[], object]) -> None:
+        self._thunks = thunks
+
+    def release(self) -> None:
+        for key in self._thunks:
+            self.pop(key, None)
+        self._thunks = {}
+
+
+def _isoformat_ns(timestamp_ns: int) -> str:
+    return datetime.fromtimestamp(timestamp_ns / 1e9).isoformat()
+
+
+def _format_traceback(exc: BaseException) -> str:
+    return "".join(traceback.TracebackException.from_exception(exc).format())
+
+
+def _compile_template(template: str) -> Callable[[Mapping[str, object]], str]:
+    """Return a function rendering ``template`` from a context mapping.
+
+    The template is parsed once. Plain ``{name}`` fields are looked up and
+    joined directly; templates using conversions, format specs or attribute
+    and index access fall back to ``str.format_map``.
+    """
+
+    parts: list[tuple[str, Optional[str]]] = []
+    for literal, field, spec, conversion in string.Formatter().parse(template):
+        if field is not None and (
+            spec or conversion or not field.isidentifier()
+        ):
+            return template.format_map
+        parts.append((literal, field))
+
+    def render(context: Mapping[str, object]) -> str:
+        out = []
+        for literal, field in parts:
+            out.append(literal)
+            if field is not None:
+                out.append(format(context[field]))
+        return "".join(out)
+
+    return render
+
+
+def _channels(
+    origin: str,
+    destination: str,
+    cfg: _Env,
+    failed: bool,
+    timeout: float = _TIMEOUT,
+) -> list[Channel]:
+    """Return the senders enabled by ``cfg``.
+
+    Mail is always sent, Teams when a webhook is configured and Jira only for
+    failures with complete Jira settings.
+    """
+
+    channels: list[Channel] = [
+        partial(
+            _send_mail,
+            origin,
+            destination,
+            token=cfg.outlook_token,
+            timeout=timeout,
+        )
+    ]
+    if cfg.teams_webhook:
+        channels.append(
+            partial(_send_to_teams, cfg.teams_webhook, timeout=timeout)
+        )
+    if failed and cfg.jira_enabled:
+        channels.append(
+            partial(
+                _create_jira_ticket,
+                cfg.jira_endpoint,
+                cfg.jira_auth,
+                cfg.jira_project,
+                cfg.jira_type,
+                timeout=timeout,
+            )
+        )
+    return channels
+
+
+def _notify_all(
+    subject: str, body: str, channels: list[Channel], timeout: float = _TIMEOUT
+) -> None:
+    """Deliver ``subject`` and ``body`` to every channel concurrently.
+
+    Network errors and timeouts are logged per channel so one unreachable
+    service does not stop delivery to the others; any other error is
+    re-raised. ``timeout`` is the channels' per-request timeout; all channels
+    together are waited on for at most ``_notify_limit(timeout)`` seconds.
+    """
+
+    if len(channels) == 1:
+        _send_logged(channels[0], subject, body)
+        return
+
+    errors: list[Exception] = []
+
+    def send_one(send: Channel) -> None:
+        try:
+            _send_logged(send, subject, body)
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = []
+    for send in channels:
+        thread = threading.Thread(
+            target=send_one, args=(send,), name="hermes-send", daemon=True
+        )
+        try:
+            thread.start()
+        except RuntimeError:
+            # New threads are refused while the interpreter shuts down, which
+            # is when notifications for a job that crashed are still queued.
+            send_one(send)
+            continue
+        threads.append(thread)
+    limit = _notify_limit(timeout)
+    deadline = time.monotonic() + limit
+    for thread in threads:
+        thread.join(max(0.0, deadline - time.monotonic()))
+
+    running = sum(thread.is_alive() for thread in threads)
+    if running:
+        log.warning(
+            "Failed to deliver notification %r: %d channel(s) still running "
+            "after %s seconds",
+            subject,
+            running,
+            limit,
+        )
+    if errors:
+        raise errors[0]
+
+
+def _send_logged(send: Channel, subject: str, body: str) -> None:
+    try:
+        send(subject, body)
+    except Exception as exc:
+        import http.client
+
+        if not isinstance(exc, (OSError, http.client.HTTPException)):
+            raise
+        name = getattr(getattr(send, "func", send), "__name__", repr(send))
+        log.warning(
+            "Failed to deliver notification %r via %s: %s", subject, name, exc
+        )
+
+
+def _notify_in_background(
+    subject: str, body: str, channels: list[Channel], timeout: float = _TIMEOUT
+) -> None:
+    if _exiting.is_set() or (
+        len(_workers) < _NOTIFY_WORKERS and not _start_workers()
+    ):
+        # The interpreter is shutting down; deliver before it exits.
+        try:
+            _notify_all(subject, body, channels, timeout)
+        except Exception:
+            log.exception("Failed to deliver notification %r", subject)
+        return
+    for send in channels:
+        _notify_queue.put((send, subject, body, timeout))
+
+
+def _start_workers() -> bool:
+    """Start any missing delivery workers and return whether one is running.
+
+    Threads cannot be started while the interpreter shuts down, so this may
+    start fewer than ``_NOTIFY_WORKERS``.
+    """
+
+    with _workers_lock:
+        while len(_workers) < _NOTIFY_WORKERS:
+            worker = threading.Thread(
+                target=_work, name="hermes-notify", daemon=True
+            )
+            try:
+                worker.start()
+            except RuntimeError:
+                break
+            _workers[worker] = 0.0
+        return bool(_workers)
+
+
+def _work() -> None:
+    worker = threading.current_thread()
+    while True:
+        send, subject, body, timeout = _notify_queue.get()
+        _workers[worker] = time.monotonic() + _notify_limit(timeout)
+        try:
+            _send_queued(send, subject, body)
+        finally:
+            _workers[worker] = 0.0
+            _notify_queue.task_done()
+
+
+def _send_queued(send: Channel, subject: str, body: str) -> None:
+    try:
+        _send_logged(send, subject, body)
+    except Exception:
+        log.exception("Failed to deliver notification %r", subject)
+
+
+def _drain_notifications() -> None:
+    """Deliver queued notifications before the interpreter exits.
+
+    Registered with :mod:`atexit`. Queued channels are sent from the exiting
+    thread, and deliveries the workers are still running are waited on until
+    their ``_notify_limit`` runs out.
+    """
+
+    _exiting.set()
+    while True:
+        try:
+            send, subject, body, _ = _notify_queue.get_nowait()
+        except queue.Empty:
+            break
+        try:
+            _send_queued(send, subject, body)
+        finally:
+            _notify_queue.task_done()
+    busy_until = max(_workers.values(), default=0.0)
+    wait_for_notifications(max(0.0, busy_until - time.monotonic()))
+
+
+def wait_for_notifications(timeout: Optional[float] = None) -> None:
+    """Block until background notifications have been delivered.
+
+    Waits at most ``timeout`` seconds when given.
+    """
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    with _notify_queue.all_tasks_done:
+        while _notify_queue.unfinished_tasks:
+            if deadline is None:
+                _notify_queue.all_tasks_done.wait()
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            _notify_queue.all_tasks_done.wait(remaining)
+
+
+class _Batcher:
+    """Collect notifications and deliver them every ``window`` seconds.
+
+    Messages queued with the same subject during one window are merged into a
+    single notification.
+    """
+
+    def __init__(self, window: float, timeout: float = _TIMEOUT) -> None:
+        self.window = window
+        self.timeout = timeout
+        self._pending: deque[tuple[str, str, list[Channel]]] = deque()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, subject: str, body: str, channels: list[Channel]) -> None:
+        with self._lock:
+            self._pending.append((subject, body, channels))
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="hermes-batch", daemon=True
+                )
+                self._thread.start()
+                atexit.register(self.close)
+
+    def flush(self) -> None:
+        with self._lock:
+            pending = list(self._pending)
+            self._pending.clear()
+
+        merged: dict[str, tuple[list[str], list[Channel]]] = {}
+        for subject, body, channels in pending:
+            bodies = merged[subject][0] if subject in merged else []
+            bodies.append(body)
+            merged[subject] = (bodies, channels)
+
+        for subject, (bodies, channels) in merged.items():
+            if len(bodies) > 1:
+                subject = f"{subject} ({len(bodies)} times)"
+            try:
+                _notify_all(
+                    subject,
+                    "\n\n---\n\n".join(bodies),
+                    channels,
+                    timeout=self.timeout,
+                )
+            except Exception:
+                log.exception("Failed to deliver batched notification %r", subject)
+
+    def close(self) -> None:
+        """Stop the flush thread and deliver everything still queued.
+
+        Registered with :mod:`atexit`, so it must not rely on thread pools;
+        ``_notify_all`` falls back to sending inline during shutdown.
+        """
+
+        self._stop.set()
+        if self._thread is not None:
+            # Let a flush already in progress finish before the final one.
+            self._thread.join(_notify_limit(self.timeout))
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.window):
+            self.flush()
+
+
+def _send_mail(
+    origin: str,
+    destination: str,
+    subject: str,
+    body: str,
+    token: Optional[str] = None,
+    timeout: float = _TIMEOUT,
+) -> None:
     """Send ``body`` with ``subject`` from ``origin`` to ``destination``.
 
-    If the environment variable ``OUTLOOK_TOKEN`` is set, the message is sent
-    using the Microsoft Outlook API. Otherwise, a local SMTP server on
-    ``localhost`` is used.
+    If an Outlook ``token`` is given, the message is sent using the Microsoft
+    Outlook API. Otherwise, a local SMTP server on ``localhost`` is used.
     """
 
-    token = os.getenv("OUTLOOK_TOKEN")
     if token:
-        _send_via_outlook(origin, destination, subject, body, token)
+        _send_via_outlook(origin, destination, subject, body, token, timeout)
     else:
-        _send_via_smtp(origin, destination, subject, body)
+        _send_via_smtp(origin, destination, subject, body, timeout)
 
 
-def _send_via_smtp(origin: str, destination: str, subject: str, body: str) -> None:
+def _send_via_smtp(
+    origin: str,
+    destination: str,
+    subject: str,
+    body: str,
+    timeout: float = _TIMEOUT,
+) -> None:
+    import smtplib
+
     message = f"Subject: {subject}\n\n{body}"
-    with smtplib.SMTP("localhost") as smtp:  # pragma: no cover - network call
-        smtp.sendmail(origin, destination, message)
+    with _smtp_lock:
+        smtp = _get_smtp("localhost", 25, timeout)
+        try:
+            smtp.sendmail(origin, destination, message)
+        except smtplib.SMTPServerDisconnected:
+            _discard_smtp(("localhost", 25))
+            raise
+        except smtplib.SMTPException:
+            # A refused sender, recipient or message leaves the session usable.
+            raise
+        except OSError:
+            _discard_smtp(("localhost", 25))
+            raise
+
+
+def _get_smtp(host: str, port: int, timeout: float = _TIMEOUT) -> smtplib.SMTP:
+    """Return a live pooled connection to ``host``:``port``.
+
+    Must be called with ``_smtp_lock`` held. Connections older than
+    ``_SMTP_MAX_AGE`` or not answering ``NOOP`` with ``250``, such as a
+    server ending the session with ``421 Timeout``, are replaced, and reused
+    connections adopt ``timeout``.
+    """
+
+    import smtplib
+
+    key = (host, port)
+    pooled = _smtp_pool.get(key)
+    if pooled is not None:
+        smtp, created = pooled
+        if time.monotonic() - created < _SMTP_MAX_AGE:
+            smtp.timeout = timeout
+            if smtp.sock is not None:
+                smtp.sock.settimeout(timeout)
+            try:
+                if smtp.noop()[0] == 250:
+                    return smtp
+            except OSError:
+                pass
+        _discard_smtp(key)
+
+    smtp = smtplib.SMTP(host, port, timeout=timeout)  # pragma: no cover - network call
+    _smtp_pool[key] = (smtp, time.monotonic())
+    return smtp
+
+
+def _discard_smtp(key: tuple[str, int]) -> None:
+    pooled = _smtp_pool.pop(key, None)
+    if pooled is None:
+        return
+    try:
+        pooled[0].quit()
+    except OSError:
+        pooled[0].close()
+
+
+def close_smtp_pool() -> None:
+    """Close every pooled SMTP connection."""
+
+    with _smtp_lock:
+        for key in list(_smtp_pool):
+            _discard_smtp(key)
+
+
+atexit.register(close_smtp_pool)
 
 
 def _send_via_outlook(
-    origin: str, destination: str, subject: str, body: str, token: str
+    origin: str,
+    destination: str,
+    subject: str,
+    body: str,
+    token: str,
+    timeout: float = _TIMEOUT,
 ) -> None:
-    payload = json.dumps(
-        {
-            "message": {
-                "subject": subject,
-                "body": {"contentType": "Text", "content": body},
-                "from": {"emailAddress": {"address": origin}},
-                "toRecipients": [
-                    {"emailAddress": {"address": destination}}
-                ],
-            },
-            "saveToSentItems": "false",
-        }
-    ).encode("utf-8")
-
-    req = urllib.request.Request(
+    payload = _OUTLOOK_PAYLOAD % tuple(
+        map(_dumps, (subject, body, origin, destination))
+    )
+    _post_json(
         "https://graph.microsoft.com/v1.0/me/sendMail",
-        data=payload,
-        method="POST",
+        payload,
+        {"Authorization": f"Bearer {token}"},
+        timeout,
     )
-    req.add_header("Authorization", f"Bearer {token}")
-    req.add_header("Content-Type", "application/json")
-
-    with urllib.request.urlopen(req):  # pragma: no cover - network call
-        pass
 
 
-def _send_to_teams(webhook: str, subject: str, body: str) -> None:
-    payload = json.dumps({"text": f"**{subject}**\n\n{body}"}).encode("utf-8")
-    req = urllib.request.Request(webhook, data=payload, method="POST")
-    req.add_header("Content-Type", "application/json")
-    with urllib.request.urlopen(req):  # pragma: no cover - network call
-        pass
+def _send_to_teams(
+    webhook: str, subject: str, body: str, timeout: float = _TIMEOUT
+) -> None:
+    payload = _TEAMS_PAYLOAD % _dumps(f"**{subject}**\n\n{body}")
+    _post_json(webhook, payload, timeout=timeout)
 
 
 def _create_jira_ticket(
-    url: str,
-    email: str,
-    token: str,
+    endpoint: str,
+    auth: str,
     project: str,
     issue_type: str,
     summary: str,
     description: str,
+    timeout: float = _TIMEOUT,
 ) -> None:
-    payload = json.dumps(
-        {
-            "fields": {
-                "summary": summary,
-                "description": description,
-                "project": {"key": project},
-                "issuetype": {"name": issue_type},
-            }
-        }
-    ).encode("utf-8")
-
-    req = urllib.request.Request(
-        f"{url.rstrip('/')}/rest/api/3/issue", data=payload, method="POST"
+    payload = _JIRA_PAYLOAD % tuple(
+        map(_dumps, (summary, description, project, issue_type))
     )
-    auth = base64.b64encode(f"{email}:{token}".encode()).decode()
-    req.add_header("Authorization", f"Basic {auth}")
-    req.add_header("Content-Type", "application/json")
-    with urllib.request.urlopen(req):  # pragma: no cover - network call
-        pass
+    _post_json(endpoint, payload, {"Authorization": auth}, timeout)
+
+
+def _basic_auth(email: str, token: str) -> str:
+    import base64
+
+    credentials = base64.b64encode(f"{email}:{token}".encode()).decode()
+    return f"Basic {credentials}"
+
+
+def _post_json(
+    url: str,
+    payload: bytes,
+    headers: Optional[dict[str, str]] = None,
+    timeout: float = _TIMEOUT,
+) -> None:
+    """POST ``payload`` to ``url`` over a pooled keep-alive connection.
+
+    Idle pooled connections the server has closed are discarded before use.
+    If sending on a reused connection still fails because the server dropped
+    it, the request is sent once more on a fresh connection; POST is not
+    idempotent, so nothing is resent once the request may have reached the
+    server. Each socket operation waits at most ``timeout`` seconds. Error
+    responses raise ``urllib.error.HTTPError``.
+
+    Proxies configured through ``HTTPS_PROXY``/``HTTP_PROXY`` are used unless
+    ``NO_PROXY`` excludes the host, as with ``urllib.request``.
+    """
+
+    import http.client
+    import urllib.parse
+
+    parts = urllib.parse.urlsplit(url)
+    key = (parts.scheme, parts.netloc)
+    path = parts.path or "/"
+    if parts.query:
+        path = f"{path}?{parts.query}"
+    request_headers = {
+        "Content-Type": "application/json",
+        "Connection": "keep-alive",
+        **(headers or {}),
+    }
+    proxy = _proxy_for(parts.scheme, parts.netloc)
+    if proxy is not None and parts.scheme != "https":
+        # A forwarding proxy needs the absolute URL as the request target.
+        path = url
+        request_headers.update(_proxy_headers(proxy))
+
+    with _http_lock:
+        idle = _http_pool.get(key)
+        conn = idle.pop() if idle else None
+    if conn is not None and _is_stale(conn):
+        conn.close()
+        conn = None
+
+    if conn is None:
+        conn = _connect(parts.scheme, parts.netloc, timeout, proxy)
+        reused = False
+    else:
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        reused = True
+
+    try:
+        try:
+            conn.request("POST", path, payload, request_headers)
+        except (
+            http.client.RemoteDisconnected,
+            BrokenPipeError,
+            ConnectionResetError,
+        ):
+            if not reused:
+                raise
+            # The server closed the pooled socket before reading the request.
+            conn.close()
+            conn = _connect(parts.scheme, parts.netloc, timeout, proxy)
+            conn.request("POST", path, payload, request_headers)
+        response = conn.getresponse()
+        response.read()
+    except (http.client.HTTPException, OSError):
+        conn.close()
+        raise
+
+    if response.will_close:
+        conn.close()
+    else:
+        with _http_lock:
+            _http_pool.setdefault(key, []).append(conn)
+
+    if response.status >= 400:
+        import urllib.error
+
+        raise urllib.error.HTTPError(
+            url, response.status, response.reason, response.headers, None
+        )
+
+
+def _is_stale(conn: http.client.HTTPConnection) -> bool:
+    """Return whether the server has closed idle connection ``conn``.
+
+    An idle keep-alive socket only becomes readable when the peer closes it
+    (or sends unsolicited data), either of which makes it unusable.
+    """
+
+    if conn.sock is None:
+        return False
+    import select
+
+    try:
+        readable, _, _ = select.select([conn.sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    except TypeError:
+        # Not backed by a real descriptor, so it cannot be polled; leave it
+        # to the send path, which still handles a dropped connection.
+        return False
+    return bool(readable)
+
+
+def _connect(
+    scheme: str,
+    netloc: str,
+    timeout: float = _TIMEOUT,
+    proxy: Optional[urllib.parse.SplitResult] = None,
+) -> http.client.HTTPConnection:
+    import http.client
+
+    if proxy is None:
+        if scheme == "https":
+            return http.client.HTTPSConnection(netloc, timeout=timeout)
+        return http.client.HTTPConnection(netloc, timeout=timeout)
+
+    # HTTPS is tunnelled through the proxy with CONNECT; plain HTTP is sent
+    # to the proxy itself.
+    proxy_port = proxy.port or 80
+    if scheme == "https":
+        conn = http.client.HTTPSConnection(
+            proxy.hostname, proxy_port, timeout=timeout
+        )
+        conn.set_tunnel(netloc, headers=_proxy_headers(proxy))
+        return conn
+    return http.client.HTTPConnection(proxy.hostname, proxy_port, timeout=timeout)
+
+
+@lru_cache(maxsize=32)
+def _proxy_for(scheme: str, netloc: str) -> Optional[urllib.parse.SplitResult]:
+    """Return the proxy configured for ``scheme`` requests to ``netloc``.
+
+    Looking the settings up scans the whole environment, so the answer is
+    cached; like ``urllib.request.urlopen``, proxies are read once per process.
+    """
+
+    import urllib.parse
+    import urllib.request
+
+    proxy = urllib.request.getproxies().get(scheme)
+    if not proxy or urllib.request.proxy_bypass(netloc):
+        return None
+    if "://" not in proxy:
+        proxy = f"http://{proxy}"
+    return urllib.parse.urlsplit(proxy)
+
+
+def _proxy_headers(proxy: urllib.parse.SplitResult) -> dict[str, str]:
+    if proxy.username is None:
+        return {}
+    import urllib.parse
+
+    user = urllib.parse.unquote(proxy.username)
+    password = urllib.parse.unquote(proxy.password or "")
+    return {"Proxy-Authorization": _basic_auth(user, password)}
+
+
+def close_http_pool() -> None:
+    """Close every pooled HTTP connection."""
+
+    with _http_lock:
+        for connections in _http_pool.values():
+            for conn in connections:
+                conn.close()
+        _http_pool.clear()
+
+
+atexit.register(close_http_pool)
+# Registered after the pool cleanup hooks so it runs before them.
+atexit.register(_drain_notifications)